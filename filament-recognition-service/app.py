@@ -3,15 +3,18 @@ FastAPI application for filament image recognition service.
 """
 import io
 import logging
-from typing import List
-from fastapi import FastAPI, File, UploadFile, HTTPException, status
+from contextlib import asynccontextmanager
+from typing import List, Optional, Tuple
+from fastapi import FastAPI, File, UploadFile, HTTPException, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from PIL import Image
 
 from config import config, Config
 from models import RecognitionResponse, RecognizedFilamentData
-from recognizer import get_recognizer
+from recognizer import ImageRecognizer, create_encode_pool, create_http_client
+from batcher import RecognitionBatcher
+from result_cache import RecognitionCache
 
 # Configure logging
 logging.basicConfig(
@@ -20,6 +23,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Chunk size used when streaming uploads into memory
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
 # Validate configuration on startup
 try:
     Config.validate()
@@ -27,39 +33,62 @@ except ValueError as e:
     logger.error(f"Configuration error: {e}")
     raise
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Initialize services on startup."""
+    logger.info("Starting Filament Recognition Service...")
+    logger.info(f"Model: {config.MODEL_NAME}")
+    logger.info(f"Server: {config.HOST}:{config.PORT}")
+    
+    # Initialize recognizer
+    try:
+        app.state.http = create_http_client()
+        app.state.recognizer = ImageRecognizer(app.state.http, create_encode_pool())
+        logger.info("Recognizer initialized successfully")
+    except Exception as e:
+        logger.error(f"Failed to initialize recognizer: {e}")
+        raise
+    
+    # Start request batcher
+    app.state.batcher = RecognitionBatcher(
+        app.state.recognizer,
+        max_batch_size=config.BATCH_MAX_SIZE,
+        window_ms=config.BATCH_WINDOW_MS
+    )
+    app.state.batcher.start()
+    
+    # Results cache for repeated uploads of the same image
+    app.state.cache = RecognitionCache(
+        maxsize=config.RESULT_CACHE_SIZE,
+        ttl=config.RESULT_CACHE_TTL
+    )
+    
+    yield
+    
+    await app.state.batcher.stop()
+    await app.state.http.aclose()
+    app.state.recognizer.shutdown_encode_pool()
+
+
 # Create FastAPI app
 app = FastAPI(
     title="Filament Recognition Service",
     description="3D打印耗材标签图像识别服务，基于qwen3-vl-plus模型",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=config.CORS_ORIGINS if "*" not in config.CORS_ORIGINS else ["*"],
+    allow_origins=config.EFFECTIVE_CORS_ORIGINS,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
 )
 
 
-@app.on_event("startup")
-async def startup_event():
-    """Initialize services on startup."""
-    logger.info("Starting Filament Recognition Service...")
-    logger.info(f"Model: {config.MODEL_NAME}")
-    logger.info(f"Server: {config.HOST}:{config.PORT}")
-    
-    # Initialize recognizer
-    try:
-        get_recognizer()
-        logger.info("Recognizer initialized successfully")
-    except Exception as e:
-        logger.error(f"Failed to initialize recognizer: {e}")
-        raise
-
-
 @app.get("/")
 async def root():
     """Root endpoint."""
@@ -71,13 +100,14 @@ async def root():
 
 
 @app.get("/health")
-async def health_check():
+async def health_check(request: Request):
     """Health check endpoint."""
-    return {"status": "healthy"}
+    cache: RecognitionCache = request.app.state.cache
+    return {"status": "healthy", "cache": cache.stats()}
 
 
 def validate_image_file(file: UploadFile) -> None:
-    """Validate uploaded image file."""
+    """Validate uploaded image file name (size is enforced while streaming the upload)."""
     # Check file extension
     file_ext = file.filename.split(".")[-1].lower() if file.filename else ""
     if file_ext not in config.ALLOWED_IMAGE_TYPES:
@@ -85,41 +115,30 @@ def validate_image_file(file: UploadFile) -> None:
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Unsupported image type. Allowed types: {', '.join(config.ALLOWED_IMAGE_TYPES)}"
         )
-    
-    # Check file size (if available)
-    if hasattr(file, 'size') and file.size:
-        max_size = config.get_max_image_size_bytes()
-        if file.size > max_size:
+
+
+async def read_upload_contents(file: UploadFile) -> bytes:
+    """Read uploaded file in chunks, aborting as soon as the size limit is exceeded."""
+    max_size = config.get_max_image_size_bytes()
+    buf = bytearray()
+    while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+        buf.extend(chunk)
+        if len(buf) > max_size:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Image file too large. Maximum size: {config.MAX_IMAGE_SIZE_MB}MB"
             )
+    return bytes(buf)
 
 
-async def load_image_from_upload(file: UploadFile) -> Image.Image:
-    """Load PIL Image from uploaded file."""
+def load_image_from_bytes(contents: bytes) -> Tuple[Image.Image, Optional[str]]:
+    """Load PIL Image from uploaded bytes, along with its detected MIME type."""
     try:
-        # Read file content
-        contents = await file.read()
-        
-        # Check size
-        max_size = config.get_max_image_size_bytes()
-        if len(contents) > max_size:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Image file too large. Maximum size: {config.MAX_IMAGE_SIZE_MB}MB"
-            )
-        
-        # Open image with PIL
+        # Only parse the header here; pixel data is decoded later by whichever
+        # encoder handles the upload (libvips, or Pillow as the fallback)
         image = Image.open(io.BytesIO(contents))
         
-        # Verify it's a valid image
-        image.verify()
-        
-        # Reopen for actual use (verify() closes the image)
-        image = Image.open(io.BytesIO(contents))
-        
-        return image
+        return image, Image.MIME.get(image.format)
         
     except Exception as e:
         logger.error(f"Failed to load image: {e}")
@@ -130,11 +149,12 @@ async def load_image_from_upload(file: UploadFile) -> Image.Image:
 
 
 @app.post("/api/v1/recognize", response_model=RecognitionResponse)
-async def recognize_filament(image: UploadFile = File(...)):
+async def recognize_filament(request: Request, image: UploadFile = File(...)):
     """
     Recognize filament information from uploaded image.
     
     Args:
+        request: Incoming request (used to reach app state)
         image: Image file (JPEG, PNG)
         
     Returns:
@@ -144,15 +164,30 @@ async def recognize_filament(image: UploadFile = File(...)):
         # Validate file
         validate_image_file(image)
         
-        # Load image
+        # Read file content (size limit enforced while streaming)
         logger.info(f"Processing image: {image.filename}")
-        pil_image = await load_image_from_upload(image)
+        contents = await read_upload_contents(image)
         
-        # Get recognizer and perform recognition
-        recognizer = get_recognizer()
-        recognized_data, confidence = await recognizer.recognize(pil_image)
+        # Return the cached result if this exact image was recognized recently
+        cache: RecognitionCache = request.app.state.cache
+        cache_key = cache.key_for(contents)
+        cached = await cache.get(cache_key)
         
-        logger.info(f"Recognition successful. Confidence: {confidence:.2f}")
+        if cached is not None:
+            recognized_data, confidence = cached
+            logger.info(f"Recognition cache hit. Confidence: {confidence:.2f}")
+        else:
+            # Load image
+            pil_image, content_type = load_image_from_bytes(contents)
+            
+            # Perform recognition (batched with concurrent requests when enabled)
+            batcher: RecognitionBatcher = request.app.state.batcher
+            recognized_data, confidence = await batcher.submit(
+                pil_image, contents=contents, content_type=content_type
+            )
+            await cache.set(cache_key, (recognized_data, confidence))
+            
+            logger.info(f"Recognition successful. Confidence: {confidence:.2f}")
         
         return RecognitionResponse(
             success=True,
@@ -175,7 +210,7 @@ async def recognize_filament(image: UploadFile = File(...)):
 async def global_exception_handler(request, exc):
     """Global exception handler."""
     logger.error(f"Unhandled exception: {exc}", exc_info=True)
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         content={
             "success": False,
@@ -190,5 +225,8 @@ if __name__ == "__main__":
         "app:app",
         host=config.HOST,
         port=config.PORT,
+        # "auto" picks uvloop/httptools (installed by uvicorn[standard]) where available
+        loop="auto",
+        http="auto",
         reload=True
     )
@@ -0,0 +1,128 @@
+"""
+Micro-batching of concurrent recognition requests into shared model calls.
+"""
+import asyncio
+import logging
+from typing import List, Optional, Set, Tuple
+
+from PIL import Image
+
+from models import RecognizedFilamentData
+from recognizer import BatchItemResult, BatchParseError, ImageRecognizer, RecognitionInput
+
+logger = logging.getLogger(__name__)
+
+
+class RecognitionBatcher:
+    """Coalesces concurrent recognition requests into batched model calls."""
+    
+    def __init__(self, recognizer: ImageRecognizer, max_batch_size: int, window_ms: int):
+        """
+        Args:
+            recognizer: Recognizer used to perform the model calls
+            max_batch_size: Maximum number of images per model call
+            window_ms: How long to wait for more requests after the first one arrives
+        """
+        self._recognizer = recognizer
+        self._max_batch_size = max_batch_size
+        self._window = window_ms / 1000.0
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._consumer: Optional[asyncio.Task] = None
+        self._pending: Set[asyncio.Task] = set()
+    
+    @property
+    def enabled(self) -> bool:
+        """Whether requests are batched at all."""
+        return self._max_batch_size > 1
+    
+    def start(self) -> None:
+        """Start the queue consumer task."""
+        if self.enabled and self._consumer is None:
+            self._consumer = asyncio.create_task(self._run())
+    
+    async def stop(self) -> None:
+        """Stop the consumer and wait for in-flight batches to finish."""
+        if self._consumer is not None:
+            self._consumer.cancel()
+            try:
+                await self._consumer
+            except asyncio.CancelledError:
+                pass
+            self._consumer = None
+        
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+        
+        # Fail anything still queued
+        while not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(Exception("Recognition service is shutting down"))
+    
+    async def submit(
+        self,
+        image: Image.Image,
+        contents: Optional[bytes] = None,
+        content_type: Optional[str] = None
+    ) -> Tuple[RecognizedFilamentData, float]:
+        """Queue one image for recognition and wait for its result."""
+        if not self.enabled:
+            return await self._recognizer.recognize(image, contents, content_type)
+        
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put(((image, contents, content_type), future))
+        return await future
+    
+    async def _run(self) -> None:
+        """Collect queued requests into batches and dispatch them."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self._window
+            
+            while len(batch) < self._max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            
+            # Process in the background so the next batch can start collecting
+            task = asyncio.create_task(self._process(batch))
+            self._pending.add(task)
+            task.add_done_callback(self._pending.discard)
+    
+    async def _process(self, batch: List[Tuple[RecognitionInput, asyncio.Future]]) -> None:
+        """Run one batch and resolve each request's future."""
+        items = [item for item, _ in batch]
+        results: List[BatchItemResult]
+        try:
+            results = await self._recognizer.recognize_batch(items)
+        except BatchParseError as e:
+            # The reply didn't line up with the images; retry each one on its own
+            logger.warning(f"{e}; retrying {len(items)} images individually")
+            results = [None] * len(items)
+        except Exception as e:
+            # Transport / HTTP status errors: retrying per image would only add load
+            results = [e] * len(items)
+        
+        # Retry images the batched reply had no usable object for
+        retry = [i for i, result in enumerate(results) if result is None]
+        if retry:
+            retried = await asyncio.gather(
+                *(self._recognizer.recognize(*items[i]) for i in retry),
+                return_exceptions=True
+            )
+            for i, result in zip(retry, retried):
+                results[i] = result
+        
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                # Client went away
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
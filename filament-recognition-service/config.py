@@ -3,7 +3,7 @@ Configuration management for the recognition service.
 """
 import os
 from dotenv import load_dotenv
-from typing import List
+from typing import List, Tuple
 
 # Load environment variables from .env file
 load_dotenv()
@@ -14,21 +14,39 @@ class Config:
     
     # Dashscope API Configuration
     DASHSCOPE_API_KEY: str = os.getenv("DASHSCOPE_API_KEY", "")
+    DASHSCOPE_BASE_URL: str = os.getenv("DASHSCOPE_BASE_URL", "https://dashscope.aliyuncs.com/api/v1")
+    DASHSCOPE_TIMEOUT: float = float(os.getenv("DASHSCOPE_TIMEOUT", "30"))
     
     # Server Configuration
     HOST: str = os.getenv("HOST", "0.0.0.0")
     PORT: int = int(os.getenv("PORT", "8000"))
     
     # CORS Configuration
-    CORS_ORIGINS: List[str] = os.getenv("CORS_ORIGINS", "*").split(",")
+    CORS_ORIGINS: Tuple[str, ...] = tuple(os.getenv("CORS_ORIGINS", "*").split(","))
+    EFFECTIVE_CORS_ORIGINS: Tuple[str, ...] = ("*",) if "*" in CORS_ORIGINS else CORS_ORIGINS
     
     # Model Configuration
     MODEL_NAME: str = os.getenv("MODEL_NAME", "qwen-vl-plus")
     MAX_TOKENS: int = int(os.getenv("MAX_TOKENS", "2000"))
     TEMPERATURE: float = float(os.getenv("TEMPERATURE", "0.1"))
+    MAX_CONCURRENT_VLM: int = int(os.getenv("MAX_CONCURRENT_VLM", "8"))
+    
+    # JPEG encode process pool, per app worker process (ENCODE_POOL_WORKERS=0 disables it)
+    ENCODE_POOL_WORKERS: int = int(os.getenv("ENCODE_POOL_WORKERS", "2"))
+    ENCODE_POOL_MIN_MB: float = float(os.getenv("ENCODE_POOL_MIN_MB", "2"))
+    ENCODE_TIMEOUT: float = float(os.getenv("ENCODE_TIMEOUT", "30"))
+    
+    # Batching Configuration (BATCH_MAX_SIZE=1 disables batching)
+    BATCH_MAX_SIZE: int = int(os.getenv("BATCH_MAX_SIZE", "4"))
+    BATCH_WINDOW_MS: int = int(os.getenv("BATCH_WINDOW_MS", "50"))
+    
+    # Result Cache Configuration
+    RESULT_CACHE_SIZE: int = int(os.getenv("RESULT_CACHE_SIZE", "4096"))
+    RESULT_CACHE_TTL: int = int(os.getenv("RESULT_CACHE_TTL", "600"))
     
     # Image Configuration
     MAX_IMAGE_SIZE_MB: int = int(os.getenv("MAX_IMAGE_SIZE_MB", "10"))
+    MAX_VLM_SIDE: int = int(os.getenv("MAX_VLM_SIDE", "1280"))
     ALLOWED_IMAGE_TYPES: List[str] = os.getenv(
         "ALLOWED_IMAGE_TYPES", "jpeg,jpg,png"
     ).lower().split(",")
@@ -45,6 +63,11 @@ class Config:
     def get_max_image_size_bytes(cls) -> int:
         """Get maximum image size in bytes."""
         return cls.MAX_IMAGE_SIZE_MB * 1024 * 1024
+    
+    @classmethod
+    def get_encode_pool_min_bytes(cls) -> int:
+        """Get upload size in bytes above which encoding uses the process pool."""
+        return int(cls.ENCODE_POOL_MIN_MB * 1024 * 1024)
 
 
 # Global config instance
@@ -1,20 +1,41 @@
 """
 Core image recognition logic using dashscope qwen3-vl-plus model.
 """
+import asyncio
 import json
-import base64
+import re
 import io
-from typing import Optional, Dict, Any, Tuple
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional, Dict, Any, List, Tuple, Union
 import logging
-from PIL import Image
-import dashscope
-from dashscope import MultiModalConversation
+import numpy as np
+import orjson
+import pybase64
+import httpx
+from PIL import Image, ImageOps
+from turbojpeg import TurboJPEG, TJPF_RGB
 
 from config import config
 from models import RecognizedFilamentData
 
 logger = logging.getLogger(__name__)
 
+# libjpeg-turbo encoder (falls back to Pillow if the native library is missing)
+try:
+    _tj: Optional[TurboJPEG] = TurboJPEG()
+except (OSError, RuntimeError) as e:
+    logger.warning(f"libturbojpeg not available, falling back to Pillow JPEG encoder: {e}")
+    _tj = None
+
+# libvips resize+encode pipeline (falls back to Pillow if libvips is missing)
+try:
+    import pyvips
+except (ImportError, OSError) as e:
+    logger.warning(f"libvips not available, falling back to Pillow resize/encode: {e}")
+    pyvips = None
+
 
 # Prompt template for structured data extraction
 PROMPT_TEMPLATE = """请分析这张3D打印耗材标签图片，提取以下信息并以JSON格式返回：
@@ -46,171 +67,397 @@ PROMPT_TEMPLATE = """请分析这张3D打印耗材标签图片，提取以下信
 }
 """
 
+# Dashscope multimodal generation REST endpoint, relative to DASHSCOPE_BASE_URL
+MULTIMODAL_GENERATION_PATH = "/services/aigc/multimodal-generation/generation"
+
+# Extra instructions appended after PROMPT_TEMPLATE when several images are sent together
+BATCH_PROMPT_TEMPLATE = """以上要求适用于下面的每一张图片。共有{count}张图片，每张图片前标有编号。
+请返回一个JSON数组，按图片编号顺序为每张图片返回一个上述格式的JSON对象，数组长度必须等于图片数量，不要添加任何其他文字、说明或markdown代码块标记。
+"""
+
+# Matches the outermost JSON object / array in the model output
+_JSON_OBJECT_RE = re.compile(rb"\{.*\}", re.S)
+_JSON_ARRAY_RE = re.compile(rb"\[.*\]", re.S)
+
+# Image, original upload bytes and detected MIME type for one recognition
+RecognitionInput = Tuple[Image.Image, Optional[bytes], Optional[str]]
+
+# Per-image outcome of a batched call: a result, the image's own error, or
+# None when the batched reply had no usable entry for it
+BatchItemResult = Union[Tuple[RecognizedFilamentData, float], Exception, None]
+
+
+class BatchParseError(Exception):
+    """Batched model reply could not be matched up with the input images."""
+
+# Fields copied from the model output, coerced to str when present
+_STRING_FIELDS = ("brand", "material", "colorName", "weight", "temperatureInfo")
+
+# Hex color with optional leading "#"
+_COLOR_HEX_RE = re.compile(r"#?[0-9A-Fa-f]{6}")
+
+# EXIF orientation tag id
+ORIENTATION_TAG = 0x0112
+
+# Filament diameters accepted from the model output
+_VALID_DIAMETERS = (1.75, 2.85)
+
+
+def _image_to_jpeg(image: Image.Image) -> bytes:
+    """Convert PIL Image to JPEG bytes."""
+    # Apply EXIF orientation so the pixels are upright (matches libvips thumbnail)
+    image = ImageOps.exif_transpose(image)
+    
+    # Flatten transparency onto a white background (for PNG with transparency)
+    if image.mode in ('RGBA', 'LA', 'P'):
+        background = Image.new('RGBA', image.size, (255, 255, 255, 255))
+        image = Image.alpha_composite(background, image.convert('RGBA'))
+    image = image.convert('RGB')
+    
+    # Downscale large photos; the model does not need more detail to read a tag
+    image.thumbnail((config.MAX_VLM_SIDE, config.MAX_VLM_SIDE), Image.Resampling.LANCZOS)
+    
+    jpeg_bytes = None
+    if _tj is not None:
+        try:
+            jpeg_bytes = _tj.encode(np.asarray(image), quality=85, pixel_format=TJPF_RGB)
+        except Exception as e:
+            logger.warning(f"TurboJPEG encode failed, falling back to Pillow: {e}")
+    
+    if jpeg_bytes is None:
+        buffered = io.BytesIO()
+        image.save(buffered, format="JPEG", quality=85)
+        jpeg_bytes = buffered.getvalue()
+    
+    return jpeg_bytes
+
+
+def _vips_to_jpeg(contents: bytes) -> bytes:
+    """Decode, downscale and re-encode uploaded bytes to JPEG with libvips."""
+    # Shrink-on-load streaming thumbnail; never upsizes small images
+    # fail=true makes truncated or corrupt data raise instead of decoding partially
+    image = pyvips.Image.thumbnail_buffer(
+        contents, config.MAX_VLM_SIDE, height=config.MAX_VLM_SIDE, size="down",
+        option_string="fail=true"
+    )
+    
+    # Flatten transparency onto a white background and normalize to 8-bit sRGB
+    if image.hasalpha():
+        image = image.flatten(background=255)
+    if image.interpretation != "srgb":
+        image = image.colourspace("srgb")
+    
+    return image.jpegsave_buffer(Q=85, strip=True, optimize_coding=True)
+
+
+def _prepare_jpeg(image: Optional[Image.Image], contents: Optional[bytes] = None) -> bytes:
+    """Build the JPEG payload for the model, preferring libvips when available."""
+    if contents is not None and pyvips is not None:
+        try:
+            return _vips_to_jpeg(contents)
+        except pyvips.Error as e:
+            logger.warning(f"libvips encode failed, falling back to Pillow: {e}")
+    
+    if image is None:
+        image = Image.open(io.BytesIO(contents))
+    return _image_to_jpeg(image)
+
+
+def encode_upload(contents: bytes) -> bytes:
+    """Resize and encode uploaded bytes to JPEG; picklable entry point for a process pool."""
+    return _prepare_jpeg(None, contents)
+
+
+def create_encode_pool() -> Optional[ProcessPoolExecutor]:
+    """Create the JPEG encode process pool, or None when ENCODE_POOL_WORKERS is 0."""
+    if config.ENCODE_POOL_WORKERS <= 0:
+        return None
+    
+    # spawn, not fork: forking after libvips has started its threads can deadlock
+    return ProcessPoolExecutor(
+        max_workers=config.ENCODE_POOL_WORKERS,
+        mp_context=multiprocessing.get_context("spawn")
+    )
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """Create the persistent keep-alive HTTP client used for Dashscope calls."""
+    if not config.DASHSCOPE_API_KEY:
+        raise ValueError("DASHSCOPE_API_KEY is not configured")
+    
+    return httpx.AsyncClient(
+        base_url=config.DASHSCOPE_BASE_URL,
+        headers={"Authorization": f"Bearer {config.DASHSCOPE_API_KEY}"},
+        http2=True,
+        timeout=config.DASHSCOPE_TIMEOUT,
+        limits=httpx.Limits(max_keepalive_connections=config.MAX_CONCURRENT_VLM)
+    )
+
 
 class ImageRecognizer:
     """Image recognizer using dashscope qwen3-vl-plus model."""
     
-    def __init__(self):
-        """Initialize the recognizer with API key."""
-        if not config.DASHSCOPE_API_KEY:
-            raise ValueError("DASHSCOPE_API_KEY is not configured")
+    def __init__(self, http_client: httpx.AsyncClient, encode_pool: Optional[ProcessPoolExecutor] = None):
+        """
+        Initialize the recognizer.
         
-        dashscope.api_key = config.DASHSCOPE_API_KEY
-    
-    def _image_to_base64(self, image: Image.Image) -> str:
-        """Convert PIL Image to base64 string."""
-        buffered = io.BytesIO()
-        # Convert to RGB if necessary (for PNG with transparency)
-        if image.mode in ('RGBA', 'LA', 'P'):
-            # Create a white background
-            rgb_image = Image.new('RGB', image.size, (255, 255, 255))
-            if image.mode == 'P':
-                image = image.convert('RGBA')
-            rgb_image.paste(image, mask=image.split()[-1] if image.mode == 'RGBA' else None)
-            image = rgb_image
-        elif image.mode != 'RGB':
-            image = image.convert('RGB')
+        Args:
+            http_client: Client from create_http_client(), shared across requests
+            encode_pool: Optional pool from create_encode_pool(), used to encode large uploads
+        """
+        self._http = http_client
+        self._encode_pool = encode_pool
         
-        image.save(buffered, format="JPEG", quality=85)
-        img_str = base64.b64encode(buffered.getvalue()).decode()
-        return img_str
+        # Limit the number of in-flight model calls
+        self._semaphore = asyncio.Semaphore(config.MAX_CONCURRENT_VLM)
     
     def _parse_json_response(self, text: str) -> Optional[Dict[str, Any]]:
         """Parse JSON from model response text."""
-        # Try to extract JSON from the response
-        text = text.strip()
+        # Greedy match from the first "{" to the last "}", which also skips
+        # any markdown code fences or text around the JSON object
+        match = _JSON_OBJECT_RE.search(text.encode())
+        if not match:
+            return None
         
-        # Remove markdown code blocks if present
-        if text.startswith("```json"):
-            text = text[7:]
-        elif text.startswith("```"):
-            text = text[3:]
-        
-        if text.endswith("```"):
-            text = text[:-3]
-        
-        text = text.strip()
+        try:
+            return orjson.loads(match.group(0))
+        except orjson.JSONDecodeError:
+            return None
+    
+    def _parse_json_array_response(self, text: str) -> Optional[List[Optional[Dict[str, Any]]]]:
+        """Parse a JSON array of objects from a batched model response."""
+        match = _JSON_ARRAY_RE.search(text.encode())
+        if not match:
+            return None
         
         try:
-            return json.loads(text)
-        except json.JSONDecodeError:
-            # Try to find JSON object in the text
-            start_idx = text.find("{")
-            end_idx = text.rfind("}")
-            if start_idx != -1 and end_idx != -1 and end_idx > start_idx:
-                try:
-                    return json.loads(text[start_idx:end_idx + 1])
-                except json.JSONDecodeError:
-                    pass
+            parsed = orjson.loads(match.group(0))
+        except orjson.JSONDecodeError:
+            return None
         
-        return None
+        if not isinstance(parsed, list):
+            return None
+        return [item if isinstance(item, dict) and item else None for item in parsed]
     
     def _validate_and_normalize(self, data: Dict[str, Any]) -> RecognizedFilamentData:
         """Validate and normalize recognized data."""
+        # String fields (ensure they're strings)
+        cleaned = {
+            field: value if value is None or isinstance(value, str) else str(value)
+            for field in _STRING_FIELDS
+            for value in (data.get(field),)
+        }
+        
         # Normalize diameter
         diameter = data.get("diameter")
-        if diameter is not None:
-            if isinstance(diameter, str):
-                try:
-                    diameter = float(diameter)
-                except ValueError:
-                    diameter = None
-            if diameter not in [1.75, 2.85]:
+        if isinstance(diameter, str):
+            try:
+                diameter = float(diameter)
+            except ValueError:
                 diameter = None
+        cleaned["diameter"] = diameter if diameter in _VALID_DIAMETERS else None
         
-        # Normalize weight (ensure it's a string)
-        weight = data.get("weight")
-        if weight is not None and not isinstance(weight, str):
-            weight = str(weight)
-        
-        # Normalize colorHex (ensure it starts with #)
+        # Normalize colorHex (ensure it starts with #, drop anything that isn't RRGGBB)
         color_hex = data.get("colorHex")
-        if color_hex and not color_hex.startswith("#"):
-            color_hex = "#" + color_hex
-        
-        # Normalize temperatureInfo (ensure it's a string)
-        temperature_info = data.get("temperatureInfo")
-        if temperature_info is not None and not isinstance(temperature_info, str):
-            temperature_info = str(temperature_info)
-        
-        return RecognizedFilamentData(
-            brand=data.get("brand"),
-            material=data.get("material"),
-            colorName=data.get("colorName"),
-            colorHex=color_hex,
-            weight=weight,
-            diameter=diameter,
-            temperatureInfo=temperature_info
+        if isinstance(color_hex, str):
+            color_hex = color_hex.strip()
+        if isinstance(color_hex, str) and _COLOR_HEX_RE.fullmatch(color_hex):
+            cleaned["colorHex"] = color_hex if color_hex[0] == "#" else f"#{color_hex}"
+        else:
+            cleaned["colorHex"] = None
+        
+        # All fields are already normalized, so skip pydantic re-validation
+        return RecognizedFilamentData.model_construct(**cleaned)
+    
+    def _log_usage(self, result: Dict[str, Any]) -> None:
+        """Log token usage, including prompt cache hits when reported."""
+        usage = result.get("usage")
+        if not usage:
+            return
+        details = usage.get("prompt_tokens_details") or {}
+        logger.info(
+            f"Token usage: input={usage.get('input_tokens')}, "
+            f"output={usage.get('output_tokens')}, "
+            f"cached={details.get('cached_tokens', 0)}"
+        )
+    
+    def _can_send_original(self, image: Image.Image, content_type: Optional[str]) -> bool:
+        """Check whether the uploaded bytes can be sent to the model without re-encoding."""
+        # Uploads carrying EXIF/XMP metadata (GPS location, device data, orientation)
+        # are re-encoded so the metadata is stripped and the pixels are upright
+        return (
+            content_type == "image/jpeg"
+            and image.mode in ('RGB', 'L')
+            and max(image.size) <= config.MAX_VLM_SIDE
+            and "exif" not in image.info
+            and "xmp" not in image.info
+            and image.getexif().get(ORIENTATION_TAG, 1) == 1
         )
     
-    async def recognize(self, image: Image.Image) -> Tuple[RecognizedFilamentData, float]:
+    async def _encode_for_model(
+        self,
+        image: Image.Image,
+        contents: Optional[bytes],
+        content_type: Optional[str]
+    ) -> str:
+        """Build the base64 data URL for an image."""
+        # Reuse small JPEG uploads as-is; otherwise resize and encode as JPEG
+        # (CPU-bound, off the event loop). Large uploads go to the process
+        # pool to avoid the GIL; small ones stay in-process to skip IPC.
+        # Either way inline it as base64
+        if contents is not None and self._can_send_original(image, content_type):
+            # Full decode to reject corrupt data before sending the bytes as-is
+            await asyncio.to_thread(image.load)
+            jpeg_bytes = contents
+        elif (
+            contents is not None
+            and self._encode_pool is not None
+            and len(contents) > config.get_encode_pool_min_bytes()
+        ):
+            pool = self._encode_pool
+            loop = asyncio.get_running_loop()
+            try:
+                jpeg_bytes = await asyncio.wait_for(
+                    loop.run_in_executor(pool, encode_upload, contents),
+                    timeout=config.ENCODE_TIMEOUT
+                )
+            except (BrokenProcessPool, asyncio.TimeoutError) as e:
+                reason = str(e) or f"encode timed out after {config.ENCODE_TIMEOUT}s"
+                self._replace_encode_pool(pool, reason)
+                jpeg_bytes = await asyncio.to_thread(_prepare_jpeg, image, contents)
+        else:
+            jpeg_bytes = await asyncio.to_thread(_prepare_jpeg, image, contents)
+        image_base64 = pybase64.b64encode(jpeg_bytes).decode()
+        return f"data:image/jpeg;base64,{image_base64}"
+    
+    def _replace_encode_pool(self, pool: ProcessPoolExecutor, reason: str) -> None:
+        """Discard a broken or stuck encode pool and start a fresh one."""
+        if self._encode_pool is not pool:
+            # Another request already replaced it
+            return
+        
+        logger.warning(f"Encode pool failed ({reason}); restarting it and encoding in-process")
+        try:
+            self._encode_pool = create_encode_pool()
+        except Exception as e:
+            logger.warning(f"Failed to restart encode pool, encoding in-process from now on: {e}")
+            self._encode_pool = None
+        
+        # Kill the old workers so a stuck encode doesn't keep holding a CPU
+        for process in list((getattr(pool, "_processes", None) or {}).values()):
+            process.terminate()
+        pool.shutdown(wait=False, cancel_futures=True)
+    
+    def shutdown_encode_pool(self) -> None:
+        """Shut down the encode pool, if any."""
+        if self._encode_pool is not None:
+            self._encode_pool.shutdown()
+            self._encode_pool = None
+    
+    async def _call_model(self, content: List[Dict[str, Any]]) -> str:
+        """Send one user message to the model and return its text output."""
+        messages = [
+            {
+                "role": "user",
+                "content": content
+            }
+        ]
+        
+        # Call dashscope REST API over the shared keep-alive connection pool
+        async with self._semaphore:
+            response = await self._http.post(
+                MULTIMODAL_GENERATION_PATH,
+                json={
+                    "model": config.MODEL_NAME,
+                    "input": {"messages": messages},
+                    "parameters": {
+                        "max_tokens": config.MAX_TOKENS,
+                        "temperature": config.TEMPERATURE
+                    }
+                }
+            )
+        
+        # Check if request was successful
+        if response.status_code != 200:
+            error_msg = f"API request failed with status {response.status_code}"
+            try:
+                message = response.json().get("message")
+            except ValueError:
+                message = None
+            if message:
+                error_msg += f": {message}"
+            raise Exception(error_msg)
+        
+        result = response.json()
+        self._log_usage(result)
+        
+        # Extract text from response
+        # content[0] is a dict with "text" key
+        try:
+            content_item = result["output"]["choices"][0]["message"]["content"][0]
+            logger.debug(f"Content item type: {type(content_item)}, value: {content_item}")
+            
+            output_text = content_item.get("text", "") if isinstance(content_item, dict) else ""
+            
+            if not output_text:
+                # Log the full response structure for debugging
+                logger.error(f"Response structure: {json.dumps(result['output']['choices'][0]['message']['content'], indent=2, default=str)}")
+                raise Exception("No text content found in API response")
+        
+        except (IndexError, KeyError, TypeError) as e:
+            logger.error(f"Error extracting text from response: {e}")
+            logger.error(f"Response structure: {result.get('output', 'No output')}")
+            raise Exception(f"Failed to extract text from API response: {str(e)}")
+        
+        return output_text
+    
+    def _build_result(self, parsed_data: Dict[str, Any]) -> Tuple[RecognizedFilamentData, float]:
+        """Normalize parsed model output and score it."""
+        # Validate and normalize data
+        recognized_data = self._validate_and_normalize(parsed_data)
+        
+        # Calculate confidence (simple heuristic based on number of fields filled)
+        filled_fields = sum(map(bool, recognized_data.model_dump().values()))
+        confidence = filled_fields / len(RecognizedFilamentData.model_fields)
+        
+        return recognized_data, confidence
+    
+    async def recognize(
+        self,
+        image: Image.Image,
+        contents: Optional[bytes] = None,
+        content_type: Optional[str] = None
+    ) -> Tuple[RecognizedFilamentData, float]:
         """
         Recognize filament information from image.
         
         Args:
             image: PIL Image object
-            
+            contents: Original uploaded bytes, reused when already a small JPEG
+            content_type: MIME type of the original upload
+        
+        The image may be a lazily opened (header-only) PIL Image; pixel data is
+        decoded off the event loop.
+        
         Returns:
             Tuple of (RecognizedFilamentData, confidence_score)
-            
+        
         Raises:
             Exception: If recognition fails
         """
         try:
-            # Convert image to base64
-            image_base64 = self._image_to_base64(image)
+            image_url = await self._encode_for_model(image, contents, content_type)
             
-            # Prepare messages for multimodal conversation
-            messages = [
+            # The static prompt goes first so it forms a cacheable prefix
+            # across requests; only the image part differs between calls
+            output_text = await self._call_model([
+                {
+                    "text": PROMPT_TEMPLATE
+                },
                 {
-                    "role": "user",
-                    "content": [
-                        {
-                            "image": f"data:image/jpeg;base64,{image_base64}"
-                        },
-                        {
-                            "text": PROMPT_TEMPLATE
-                        }
-                    ]
+                    "image": image_url
                 }
-            ]
-            
-            # Call dashscope API
-            response = MultiModalConversation.call(
-                model=config.MODEL_NAME,
-                messages=messages,
-                max_tokens=config.MAX_TOKENS,
-                temperature=config.TEMPERATURE
-            )
-            
-            # Check if request was successful
-            if response.status_code != 200:
-                error_msg = f"API request failed with status {response.status_code}"
-                if hasattr(response, 'message'):
-                    error_msg += f": {response.message}"
-                raise Exception(error_msg)
-            
-            # Extract text from response
-            # content[0] is a dict with "text" key, not an object with .text attribute
-            try:
-                content_item = response.output.choices[0].message.content[0]
-                logger.debug(f"Content item type: {type(content_item)}, value: {content_item}")
-                
-                if isinstance(content_item, dict):
-                    output_text = content_item.get("text", "")
-                else:
-                    # Fallback for older API versions that might use object attributes
-                    output_text = getattr(content_item, "text", "")
-                
-                if not output_text:
-                    # Log the full response structure for debugging
-                    logger.error(f"Response structure: {json.dumps(response.output.choices[0].message.content, indent=2, default=str)}")
-                    raise Exception("No text content found in API response")
-                    
-            except (IndexError, AttributeError, KeyError) as e:
-                logger.error(f"Error extracting text from response: {e}")
-                logger.error(f"Response structure: {response.output if hasattr(response, 'output') else 'No output'}")
-                raise Exception(f"Failed to extract text from API response: {str(e)}")
+            ])
             
             # Parse JSON response
             parsed_data = self._parse_json_response(output_text)
@@ -218,34 +465,74 @@ class ImageRecognizer:
             if not parsed_data:
                 raise Exception("Failed to parse JSON from model response")
             
-            # Validate and normalize data
-            recognized_data = self._validate_and_normalize(parsed_data)
+            return self._build_result(parsed_data)
+        
+        except Exception as e:
+            raise Exception(f"Recognition failed: {str(e)}")
+    
+    async def recognize_batch(self, items: List[RecognitionInput]) -> List[BatchItemResult]:
+        """
+        Recognize filament information from several images in one model call.
+        
+        Args:
+            items: (image, contents, content_type) tuples, as accepted by recognize()
+        
+        Returns:
+            One entry per input, in order: the (RecognizedFilamentData, confidence_score)
+            result, the exception for an image that could not be encoded, or None
+            when the model reply had no usable object for that image
+        
+        Raises:
+            BatchParseError: If the reply can't be parsed into one object per image
+            Exception: If the model call itself fails
+        """
+        if len(items) == 1:
+            return [await self.recognize(*items[0])]
+        
+        try:
+            encoded = await asyncio.gather(
+                *(self._encode_for_model(*item) for item in items),
+                return_exceptions=True
+            )
+            
+            # Images that fail to encode get their own error; the rest are batched
+            results: List[BatchItemResult] = [
+                Exception(f"Recognition failed: {str(url)}") if isinstance(url, Exception) else None
+                for url in encoded
+            ]
+            indices = [i for i, url in enumerate(encoded) if not isinstance(url, Exception)]
+            if not indices:
+                return results
             
-            # Calculate confidence (simple heuristic based on number of fields filled)
-            filled_fields = sum([
-                1 if recognized_data.brand else 0,
-                1 if recognized_data.material else 0,
-                1 if recognized_data.colorName else 0,
-                1 if recognized_data.colorHex else 0,
-                1 if recognized_data.weight else 0,
-                1 if recognized_data.diameter else 0,
-                1 if recognized_data.temperatureInfo else 0,
-            ])
-            confidence = filled_fields / 7.0
+            # Same static prefix as single recognition, then the batch
+            # instructions and the indexed images
+            content: List[Dict[str, Any]] = [
+                {
+                    "text": PROMPT_TEMPLATE
+                },
+                {
+                    "text": BATCH_PROMPT_TEMPLATE.format(count=len(indices))
+                }
+            ]
+            for number, i in enumerate(indices, start=1):
+                content.append({"text": f"图片{number}:"})
+                content.append({"image": encoded[i]})
+            
+            output_text = await self._call_model(content)
             
-            return recognized_data, confidence
+            # Parse JSON array response
+            parsed_items = self._parse_json_array_response(output_text)
             
+            if parsed_items is None or len(parsed_items) != len(indices):
+                raise BatchParseError("Failed to parse JSON array from model response")
+            
+            for i, parsed in zip(indices, parsed_items):
+                if parsed:
+                    results[i] = self._build_result(parsed)
+            
+            return results
+        
+        except BatchParseError:
+            raise
         except Exception as e:
-            raise Exception(f"Recognition failed: {str(e)}")
-
-
-# Global recognizer instance
-_recognizer: Optional[ImageRecognizer] = None
-
-
-def get_recognizer() -> ImageRecognizer:
-    """Get or create recognizer instance."""
-    global _recognizer
-    if _recognizer is None:
-        _recognizer = ImageRecognizer()
-    return _recognizer
+            raise Exception(f"Batch recognition failed: {str(e)}")
@@ -0,0 +1,53 @@
+"""
+Cache of recognition results keyed by uploaded image content.
+"""
+import asyncio
+from typing import Dict, Optional, Tuple
+
+from blake3 import blake3
+from cachetools import TTLCache
+
+from models import RecognizedFilamentData
+
+
+class RecognitionCache:
+    """TTL cache of recognition results keyed by the BLAKE3 hash of the upload."""
+    
+    def __init__(self, maxsize: int, ttl: int):
+        """
+        Args:
+            maxsize: Maximum number of cached results
+            ttl: Seconds a result stays valid
+        """
+        self._cache: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = asyncio.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def key_for(contents: bytes) -> str:
+        """Compute the cache key for uploaded image bytes."""
+        return blake3(contents).hexdigest()
+    
+    async def get(self, key: str) -> Optional[Tuple[RecognizedFilamentData, float]]:
+        """Return the cached result for a key, or None on a miss."""
+        async with self._lock:
+            result = self._cache.get(key)
+            if result is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return result
+    
+    async def set(self, key: str, result: Tuple[RecognizedFilamentData, float]) -> None:
+        """Store a successful recognition result."""
+        async with self._lock:
+            self._cache[key] = result
+    
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters and current size, for the health endpoint."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._cache)
+        }
@@ -3,7 +3,7 @@ Test script for the filament recognition API.
 Usage: python test_api.py <image_path>
 """
 import sys
-import requests
+import httpx
 import json
 from pathlib import Path
 
@@ -21,7 +21,7 @@ def test_api(image_path: str, api_url: str = "http://localhost:8000"):
     
     # Test health endpoint
     try:
-        response = requests.get(f"{api_url}/health", timeout=5)
+        response = httpx.get(f"{api_url}/health", timeout=5)
         print(f"Health check: {response.status_code} - {response.json()}")
     except Exception as e:
         print(f"Health check failed: {e}")
@@ -31,7 +31,7 @@ def test_api(image_path: str, api_url: str = "http://localhost:8000"):
     try:
         with open(image_path, 'rb') as f:
             files = {'image': (Path(image_path).name, f, 'image/jpeg')}
-            response = requests.post(
+            response = httpx.post(
                 f"{api_url}/api/v1/recognize",
                 files=files,
                 timeout=30
@@ -54,7 +54,7 @@ def test_api(image_path: str, api_url: str = "http://localhost:8000"):
         else:
             print(f"Error Response: {response.text}")
             
-    except requests.exceptions.Timeout:
+    except httpx.TimeoutException:
         print("Error: Request timeout (API may be slow or unavailable)")
     except Exception as e:
         print(f"Error: {e}")